@@ -14,10 +14,18 @@ v4.0.1 영어판에서 한글 블로그용으로 전환:
 
 import os
 import json
+import hashlib
 import random
 import re
+import shelve
+import threading
+import time
 import requests
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from anthropic import Anthropic
@@ -28,12 +36,46 @@ from anthropic import Anthropic
 
 CURRENT_MODE = os.getenv('BLOG_MODE', 'APPROVAL')
 CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-opus-4-5-20251101')
+# 검토·사람화는 이미 쓴 글을 다듬는 단계라 더 싸고 빠른 모델(Sonnet/Haiku)로 돌려도 된다. 기본은 같은 모델.
+CLAUDE_REVISE_MODEL = os.getenv('CLAUDE_REVISE_MODEL', CLAUDE_MODEL)
+
+# 초안·개선본 한 편의 출력 상한. 한국어는 글자당 토큰 수가 영어보다 훨씬 많아
+# 목표 분량(공백 제외 1,500~2,500자)에 HTML 태그까지 더하면 수천 토큰이 된다.
+# 상한은 쓰지 않으면 과금되지 않고 잘리면 글이 망가지므로 넉넉히 두고, 잘린 응답은 따로 걸러낸다.
+ARTICLE_MAX_TOKENS = 8000
+
+# true면 초안을 섹션별 호출로 나눠 동시에 쓰고 이어 붙인다 (초안 대기 시간 ≈ 가장 긴 섹션 하나).
+# 섹션 사이의 흐름은 바로 다음 검토 단계가 글 전체를 보고 다듬는다
+PARALLEL_SECTIONS = os.getenv('PARALLEL_SECTIONS', '').lower() == 'true'
+SECTION_MAX_TOKENS = 3000
+
+# 2 이상이면 글 N개를 Message Batches API로 한꺼번에 생성 (실시간 대신 50% 요금)
+BATCH_POSTS = int(os.getenv('BATCH_POSTS', '1'))
+BATCH_POLL_SECONDS = 30
+# 배치가 이 시간 안에 끝나지 않으면 취소하고 그 단계를 포기한다 (CI 작업이 러너 제한까지 매달리지 않게)
+BATCH_MAX_WAIT_SECONDS = int(os.getenv('BATCH_MAX_WAIT_SECONDS', str(3 * 3600)))
+
+# 429/5xx/529(과부하) 응답은 SDK가 지수 백오프로 재시도한다 (기본 2회 → 한 번 실패로 전체 실행이 날아가지 않게 늘림)
+CLAUDE_MAX_RETRIES = int(os.getenv('CLAUDE_MAX_RETRIES', '4'))
+
+# 같은 날 재실행하면 같은 페르소나·형식·톤·주제를 고르도록 날짜로 시드 (RUN_SEED로 덮어쓰기 가능)
+RUN_SEED = os.getenv('RUN_SEED', date.today().isoformat())
+# 지정하면 Claude 응답을 요청 인자 해시로 디스크에 저장해 두고, 똑같은 요청은 API 없이 재사용
+CLAUDE_CACHE_DIR = os.getenv('CLAUDE_CACHE_DIR')
+# 캐시 디렉터리가 있으면 이미지까지 붙은 완성본도 주제별로 보관해, 발행만 실패한 재실행은 바로 발행한다
+POST_CACHE_TTL = 86400
+# 1이면 저장된 완성본·응답을 읽지 않고 전부 새로 생성한다 (새 결과는 다시 저장)
+FORCE_REGEN = os.getenv('FORCE_REGEN') == '1'
+# true면 (캐시 디렉터리 아래) 주제·페르소나별 구성안을 보관해 같은 주제가 다시 나오면 구성 호출을 건너뛴다
+PLAN_CACHE_ENABLED = os.getenv('PLAN_CACHE_ENABLED', '').lower() == 'true'
+# 정확히 같은 주제가 없을 때 키워드 겹침(is_duplicate와 같은 방식)이 이 이상이면 그 구성안을 재사용
+PLAN_REUSE_SIMILARITY = 0.8
 
 # ==========================================
 # 🎭 PERSONA ROTATION (한국어 블로거 페르소나)
 # ==========================================
 
-SYSTEM_PROMPTS = [
+SYSTEM_PROMPTS = (
     {
         "name": "researcher",
         "prompt": """당신은 주제를 직접 찾아보고 정리해서 독자에게 전달하는 블로거입니다. 전문가인 척하지 않습니다. 여러 자료와 의견을 비교하고, 직접 알아본 내용을 풀어서 씁니다.
@@ -99,7 +141,7 @@ SYSTEM_PROMPTS = [
 - 결론은 구체적으로: "이런 상황이면 A, 저런 상황이면 B"
 - 가끔 흥미로운 발견엔 진심으로 신나함"""
     },
-]
+)
 
 UNIVERSAL_RULES = """
 
@@ -151,11 +193,15 @@ UNIVERSAL_RULES = """
 - 소제목은 멋보다 쓸모 있게
 """
 
+# 페르소나별 시스템 프롬프트는 import 시점에 한 번만 조립한다.
+# 매 실행 같은 바이트열이 나가야 프롬프트 캐시 접두사가 적중한다.
+PERSONA_SYSTEM_PROMPTS = {p["name"]: p["prompt"] + UNIVERSAL_RULES for p in SYSTEM_PROMPTS}
+
 # ==========================================
 # ✏️ WRITING FORMAT VARIATIONS
 # ==========================================
 
-WRITING_FORMATS = [
+WRITING_FORMATS = (
     {
         "name": "comparison_table",
         "instruction": """비교 중심의 글로 구성하세요.
@@ -242,9 +288,9 @@ WRITING_FORMATS = [
 - 추상적 원칙 말고 구체적 예시 사용
 - "후"는 막연한 이상이 아니라 실제 해볼 만하게""",
     },
-]
+)
 
-TONE_MODIFIERS = [
+TONE_MODIFIERS = (
     {"name": "chatty", "instruction": "수다스럽고 살짝 산만한 톤. 작은 곁가지로 새기도 하고. 줄표(—)를 자주 쓰고. 괄호 속 혼잣말이 특기 (이런 식으로). 가끔 '그리고', '근데'로 문장 시작. 오늘 기분 좋음."},
     {"name": "straight_shooter", "instruction": "오늘은 직설적이고 단도직입. 짧은 문장. 에두르지 않기. 별로면 별로라고. 돌려 말하는 거 좀 지침. 제 몫 못 하는 문장은 전부 잘라내기."},
     {"name": "skeptical", "instruction": "의심 모드. 다 따져봄. '근데 진짜 그래?'가 오늘의 단골 표현. 어느 정도 동의하는 것에도 일부러 반대편 들어보기. 그래도 공정하게, 그냥 더 까다로울 뿐."},
@@ -252,9 +298,9 @@ TONE_MODIFIERS = [
     {"name": "no_nonsense", "instruction": "오늘은 마케팅 말투나 막연한 주장에 인내심 제로. 출처가 흐릿하면 지적. 진짜 자료를 못 찾으면 솔직히 말하기. 독자 시간 아끼게 극도로 효율적으로."},
     {"name": "laid_back", "instruction": "느긋하고 여유로운 톤. 천천히. 모든 것에 강한 의견이 필요한 건 아님 — 가끔 '뭐, 상황 나름이죠'가 정직한 답. 편한 말투. '이 부분은 별로 관심 없는데 그래도 찾아본 건 이래요'도 괜찮음."},
     {"name": "wry_humor", "instruction": "오늘은 건조한 위트. 웃기려 하지 말고 상황의 어이없음이 알아서 드러나게. 무표정한 관찰. 가끔 한 줄 펀치. '웃긴 블로그'가 아니라 '피식하는 한숨'에 가깝게."},
-]
+)
 
-HUMAN_QUIRKS = [
+HUMAN_QUIRKS = (
     "약간 옆길로 새지만 공감되는 괄호 속 혼잣말을 딱 하나 넣기.",
     "한 문단을 '근데', '솔직히', '자 그럼' 같은 대화체로 시작하기.",
     "2~5어절짜리 짧은 문장 하나 넣기. 명사로 끝나도 됨.",
@@ -267,7 +313,7 @@ HUMAN_QUIRKS = [
     "독자에게 던지는 수사적 질문 하나 — 딱 하나만.",
     "특정 커뮤니티/카페 글을 막연히 언급: '어떤 글에서 보니까'.",
     "줄표(—)로 문장 중간에 방향을 한 번 틀기.",
-]
+)
 
 CATEGORIES = {
     'APPROVAL': {
@@ -291,94 +337,331 @@ CATEGORIES = {
 
 FALLBACK_TOPICS = {
     'APPROVAL': {
-        '직장인생산성': [
+        '직장인생산성': (
             '뽀모도로 vs 시간 블로킹, 직장인한테 진짜 맞는 건?',
             '노션 6개월 써보고 느낀 점: 과연 엑셀보다 나을까',
             '할 일 앱은 왜 한 달이면 다 방치하게 될까',
             '재택근무 루틴, 생산성 높이는 사람들의 공통점',
-        ],
-        '건강관리': [
+        ),
+        '건강관리': (
             '거북목 스트레칭, 실제로 효과 있는 동작은 따로 있다',
             '스탠딩 데스크, 연구 결과는 뭐라고 말하나',
             '눈 피로 줄이는 법: 모니터 설정부터 점검하기',
             '직장인 허리 통증, 의자 탓만은 아니다',
-        ],
-        '테크꿀팁': [
+        ),
+        '테크꿀팁': (
             '아이폰 배터리 오래 쓰는 설정, 진짜 효과 있는 것만',
             '비밀번호 관리 앱, 사람들이 실제로 불평하는 것들',
             '폰 사진 자동 백업, 무료로 끝내는 방법 비교',
             '2단계 인증, 보안 강도순으로 정리해봤다',
-        ],
-        '자기계발': [
+        ),
+        '자기계발': (
             '온라인 강의 완강률이 낮은 진짜 이유',
             '영어 공부 앱, 6개월 이상 쓰게 되는 건 어떤 거?',
             '독서 습관 만들기: 작심삼일 안 되는 현실적인 방법',
-        ],
-        '심리과학': [
+        ),
+        '심리과학': (
             '미루는 습관, 의지력 문제가 아니라는 연구들',
             '매몰비용 오류: 알아도 못 빠져나오는 이유',
-        ],
-        '생활금융': [
+        ),
+        '생활금융': (
             '가계부 앱, 끝까지 쓰게 되는 건 따로 있다',
             '구독료 새는 돈, 한 달에 얼마나 쌓이는지 계산해봤다',
-        ],
+        ),
     },
     'MONEY': {
-        '연말정산': [
+        '연말정산': (
             '연말정산 13월의 월급, 놓치기 쉬운 공제 항목 정리',
             '월세 세액공제, 자격 되는데 안 받는 사람들',
-        ],
-        '정부지원금': [
+        ),
+        '정부지원금': (
             '청년 지원금, 나도 받을 수 있는지 한 번에 확인하는 법',
             '숨은 정부 환급금 조회, 진짜 되는 사이트는 어디',
-        ],
-        '카드혜택': [
+        ),
+        '카드혜택': (
             '신용카드 연회비 본전 뽑는 법, 혜택 계산해봤다',
             '체크카드 캐시백, 카드별로 실제 혜택 비교',
-        ],
-        '금융상품': [
+        ),
+        '금융상품': (
             '파킹통장 금리 비교, 비상금 어디에 둘까',
             'ISA 계좌, 진짜 나한테 이득인지 따져봤다',
-        ],
+        ),
     }
 }
 
+# 폴백은 모드별 (카테고리, 주제) 전체를 섞어 고르므로 import 시점에 평평한 튜플로 펼쳐 둔다
+FALLBACK_TOPIC_PAIRS = {
+    mode: tuple((cat, topic) for cat, topics in pool.items() for topic in topics)
+    for mode, pool in FALLBACK_TOPICS.items()
+}
+
+# ==========================================
+# 🖋️ POST TEMPLATE (발행 HTML 고정 부분)
+# ==========================================
+
+# CSS·고지문은 글마다 똑같으니 import 시점에 한 번만 만든다.
+# CSS에 중괄호가 많아 .format 대신 앞뒤 조각을 이어 붙인다.
+POST_CSS = '''
+<style>
+    .post-body {
+        font-family: 'Apple SD Gothic Neo', 'Malgun Gothic', 'Noto Sans KR', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+        line-height: 1.85;
+        color: #1f2937;
+        font-size: 1.0625rem;
+        word-break: keep-all;
+    }
+    .post-body h2 {
+        font-size: 1.625rem;
+        font-weight: 700;
+        color: #111827;
+        margin: 3rem 0 1.25rem;
+        letter-spacing: -0.02em;
+    }
+    .post-body h3 {
+        font-size: 1.3rem;
+        font-weight: 600;
+        color: #374151;
+        margin: 2rem 0 1rem;
+    }
+    .post-body p {
+        margin-bottom: 1.5rem;
+    }
+    .post-body ul, .post-body ol {
+        margin: 1.5rem 0;
+        padding-left: 1.5rem;
+    }
+    .post-body li {
+        margin-bottom: 0.75rem;
+    }
+    .post-body blockquote {
+        border-left: 4px solid #3b82f6;
+        padding: 1rem 1.5rem;
+        background: #f8fafc;
+        color: #475569;
+        margin: 2rem 0;
+        border-radius: 0 8px 8px 0;
+    }
+    .post-body table {
+        width: 100%; border-collapse: collapse; margin: 2rem 0; font-size: 0.95rem;
+    }
+    .post-body th {
+        background: #f1f5f9; font-weight: 600; text-align: left;
+        padding: 1rem; border-bottom: 2px solid #e2e8f0;
+    }
+    .post-body td {
+        padding: 1rem; border-bottom: 1px solid #f1f5f9;
+    }
+    .disclaimer {
+        background: #fef2f2; padding: 1.25rem; border-radius: 8px;
+        font-size: 0.875rem; color: #991b1b; margin-top: 2rem;
+        border: 1px solid #fecaca;
+    }
+</style>
+'''
+
+MONEY_DISCLAIMER = '''
+<div class="disclaimer">
+    <strong>안내:</strong> 이 글의 일부 링크는 제휴 링크일 수 있으며,
+    독자에게 추가 비용 없이 이 사이트 운영에 도움이 됩니다.
+    직접 조사해서 괜찮았던 것만 소개합니다.
+</div>
+'''
+
+# 모드별로 카테고리 옆에 2개씩 뽑아 붙이는 발행 태그
+TAG_MAP = {
+    'APPROVAL': ('생활정보', '꿀팁', '정리'),
+    'MONEY': ('리뷰', '비교', '추천'),
+}
+
+POST_HTML_HEAD = POST_CSS + "<div class='post-body'>"
+POST_HTML_TAIL = (MONEY_DISCLAIMER if CURRENT_MODE == 'MONEY' else '') + "</div>"
+
+# ==========================================
+# 🧩 STRUCTURED OUTPUT (구성안 도구 스키마)
+# ==========================================
+
+# 구성 단계는 이 도구 호출을 강제해서 JSON을 tool_use 블록으로 바로 받는다.
+# 코드블록 벗기기·json.loads 실패로 폴백 호출까지 가는 일을 줄이고, 출력도 스키마 길이로 묶인다.
+PLAN_TOOL = {
+    "name": "emit_plan",
+    "description": "블로그 글 구성안을 제출한다.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "working_title": {"type": "string", "description": "구체적 이득을 약속하는 SEO 친화적 한국어 제목"},
+            "hook_concept": {"type": "string", "description": "도입을 어떻게 열지 한 문장"},
+            "contrarian_angle": {"type": "string", "description": "어떤 통념을 뒤집는가"},
+            "sections": {
+                "type": "array",
+                "minItems": 3,
+                "maxItems": 5,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "header": {"type": "string"},
+                        "key_point": {"type": "string"},
+                        "research_element": {"type": "string"},
+                    },
+                    "required": ["header", "key_point", "research_element"],
+                },
+            },
+            "honest_caveat": {"type": "string", "description": "한계 또는 '이런 경우엔 안 맞음' 하나"},
+            "image_queries": {
+                "type": "array",
+                "minItems": 2,
+                "maxItems": 2,
+                "items": {"type": "string"},
+                "description": "Unsplash 검색용 영어 문자열 2개",
+            },
+        },
+        "required": [
+            "working_title", "hook_concept", "contrarian_angle",
+            "sections", "honest_caveat", "image_queries",
+        ],
+    },
+}
+
+# 텍스트로 JSON을 받는 경로(주제 생성·구성 폴백)에서 ```json 코드블록 안쪽만 한 번에 꺼낸다
+_JSON_FENCE_RE = re.compile(r'```(?:json)?(.*?)(?:```|$)', re.DOTALL)
+# 모델이 자주 남기는 객체·배열 끝 쉼표 ({"a": 1,} → {"a": 1})
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+
+def _cached_text_block(text, ttl=None):
+    """Anthropic 프롬프트 캐시 브레이크포인트가 붙은 텍스트 블록 (ttl: None이면 기본 5분, '1h')"""
+    cache_control = {"type": "ephemeral", "ttl": ttl} if ttl else {"type": "ephemeral"}
+    return {"type": "text", "text": text, "cache_control": cache_control}
+
+
+def _compact_json(value):
+    """프롬프트에 넣는 JSON (공백 없는 구분자 + 한글 그대로 → 토큰 절약)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _response_cache_key(params):
+    """요청 인자(모델·시스템·메시지·도구)를 정규화한 JSON의 sha256"""
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _post_cache_key(topic, system_prompt):
+    """주제·모델·시스템 프롬프트가 같으면 같은 글로 보는 완성본 캐시 키"""
+    return hashlib.sha256((topic + CLAUDE_MODEL + system_prompt).encode()).hexdigest()
+
+def _plan_cache_key(topic, persona_name):
+    """띄어쓰기·문장부호·대소문자만 다른 주제는 같은 구성안 캐시 키로 모은다"""
+    normalized = re.sub(r'[\W_]+', '', topic.lower())
+    return hashlib.sha256((normalized + persona_name).encode()).hexdigest()
+
 # ==========================================
 # 🔒 SECURITY
 # ==========================================
 
+# 위험 패턴을 하나의 alternation으로 합쳐 본문을 한 번만 훑는다.
+# script/iframe 본문은 DOTALL .*? 대신 '<'가 아닌 글자 덩어리 + 닫는 태그가 아닌 '<'로 풀어 써서
+# 글자마다 lazy 매칭을 시도하지 않게 한다 (첫 닫는 태그까지라는 의미는 같다).
+_DANGEROUS_RE = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in (
+        r'<script[^>]*>[^<]*(?:<(?!/script>)[^<]*)*</script>',
+        r'<iframe[^>]*>[^<]*(?:<(?!/iframe>)[^<]*)*</iframe>',
+        r'javascript:',
+        r'<object[^>]*>',
+        r'<embed[^>]*>',
+    )),
+    re.IGNORECASE,
+)
+
+# 이벤트 핸들러 속성(onclick="..." 등)은 태그 안에서만 값까지 지운다.
+# 태그·속성 경계는 브라우저 토크나이저 규칙을 그대로 따른다: 태그는 '<' 뒤 영문자로만 시작하고,
+# 공백은 HTML 공백 다섯 글자뿐이며, 따옴표는 '=' 바로 뒤에 올 때만 값을 감싼다.
+# (아무 따옴표나 값으로 보면 a=b"c d=" > " onclick=... 처럼 경계가 어긋나 핸들러를 놓친다)
+# 속성 하나는 이름 뒤에 값이 있든 없든 '>'나 문서 끝 전에는 반드시 다음 조각이 이어지므로
+# 매칭이 실패해 되돌아가는 일이 없다 ('<'만 잔뜩 있는 입력에서도 O(n))
+_HTML_SPACE = '\t\n\f\r '
+_ATTR_PATTERN = (
+    f"""[^{_HTML_SPACE}/>][^{_HTML_SPACE}/>=]*"""
+    f"""(?:[{_HTML_SPACE}]*=[{_HTML_SPACE}]*(?:"[^"]*(?:"|\\Z)|'[^']*(?:'|\\Z)|[^{_HTML_SPACE}>]*))?"""
+)
+_TAG_RE = re.compile(
+    f"""<(/?)([a-zA-Z][^{_HTML_SPACE}/>]*)((?:[{_HTML_SPACE}/]+|{_ATTR_PATTERN})*)(>|\\Z)"""
+)
+_ATTR_RE = re.compile(f"""[{_HTML_SPACE}/]*({_ATTR_PATTERN})""")
+# 브라우저가 태그를 다르게 끊는 구문(주석·<!DOCTYPE·<?...>·</3> 같은 가짜 주석)과
+# 안쪽을 태그로 읽지 않는 요소의 여는 태그는 지워서, 남은 문서를 위 규칙만으로 읽게 만든다.
+# 코드블록을 벗긴 블로그 본문에는 원래 나올 일이 없는 것들이다
+_MARKUP_DECLARATION_RE = re.compile(r'<(?:[!?]|/(?![a-zA-Z]))[^>]*(?:>|\Z)')
+_RAW_TEXT_TAGS = frozenset((
+    'script', 'style', 'textarea', 'title', 'xmp', 'iframe',
+    'noembed', 'noframes', 'noscript', 'plaintext',
+))
+
+# 깨끗한 글(대부분)은 C 수준 부분문자열 검사만으로 정규식 치환을 건너뛴다.
+# 핸들러 속성은 고정 문자열로 거를 수 없어 그것만 따로 한 번 찾는다.
+_SUSPICIOUS_TOKENS = ('<script', '<iframe', 'javascript:', '<object', '<embed')
+# 속성 구분자(공백, '/', 닫는 따옴표) 바로 뒤에서만 시작하고 이름 길이를 32자로 묶어
+# 'o'가 나올 때마다 \w+를 끝까지 늘렸다 되돌리는 백트래킹(onononon... 입력에서 O(n²))을 막는다.
+# 실제 핸들러 이름은 가장 긴 것도 30자가 안 된다.
+_ON_HANDLER_RE = re.compile(r'''(?<=[\s/"'])on\w{1,32}\s*=''', re.IGNORECASE)
+
+# 모델이 HTML을 마크다운 코드블록으로 감쌌을 때 여는 표시(```html)를 벗겨내는 패턴.
+# 대소문자와 뒤따르는 공백이 제각각이라 이것만 정규식으로 두고, 닫는 ``` 는 str.replace로 지운다
+_CODE_FENCE_OPEN_RE = re.compile(r'```html?\s*\n?', re.IGNORECASE)
+
+_IMAGE_MARKER_RE = re.compile(r'\[IMAGE:([^\]]*)\]')
+
+
+def _drop_event_handler(attr):
+    """on으로 시작하는 속성이면 앞 구분자·값까지 통째로 지운다"""
+    return '' if attr.group(1)[:2].lower() == 'on' else attr.group()
+
+
+def _strip_event_handlers(tag):
+    """태그 하나에서 on* 속성을 값째 지운다 (안쪽을 태그로 읽지 않는 요소의 여는 태그는 통째로)"""
+    closing, name, attrs, end = tag.groups()
+    if not closing and name.lower() in _RAW_TEXT_TAGS:
+        return ''
+    return f'<{closing}{name}{_ATTR_RE.sub(_drop_event_handler, attrs)}{end}'
+
+
+def sanitize_html(content):
+    """모델 출력에서 코드블록 표시와 스크립트·이벤트 핸들러 같은 위험 패턴을 걷어낸다"""
+    if not content:
+        return ""
+    # 코드블록이 없으면(대부분) 그대로 통과. 줄 앞뒤에 고정된 여는/닫는 표시는
+    # 전체에서 지우는 치환에 이미 포함되고, 남는 공백은 마지막 strip()이 정리한다
+    if '```' in content:
+        content = _CODE_FENCE_OPEN_RE.sub('', content)
+        content = content.replace('\n```', '').replace('```', '')
+
+    lowered = content.lower()
+    if not any(token in lowered for token in _SUSPICIOUS_TOKENS) and not _ON_HANDLER_RE.search(content):
+        return content.strip()
+
+    # 지운 자리에서 새 패턴이 이어 붙을 수 있으므로 (java<script></script>script:)
+    # 더 지울 게 없을 때까지 반복. 깨끗한 글은 한 번에 끝난다.
+    # 태그 밖 본문의 글자(예: "online=")는 건드리지 않는다
+    while True:
+        cleaned = _MARKUP_DECLARATION_RE.sub('', _DANGEROUS_RE.sub('', content))
+        cleaned = _TAG_RE.sub(_strip_event_handlers, cleaned)
+        if cleaned == content:
+            return cleaned.strip()
+        content = cleaned
+
+
+@lru_cache(maxsize=1024)
+def validate_image_url(url):
+    """https + unsplash.com 호스트인지 (같은 CDN URL이 반복되니 결과를 기억해 둔다)
+
+    urlparse 없이 'https://' 뒤 호스트 부분만 잘라 본다. 부분문자열 검사였던 탓에
+    통과하던 unsplash.com.evil.com 같은 호스트는 이제 거른다."""
+    if not url or not url.startswith('https://'):
+        return False
+    host = url[8:].split('/', 1)[0].split('?', 1)[0].split('#', 1)[0].lower()
+    return host == 'unsplash.com' or host.endswith('.unsplash.com')
+
+
 class SecurityValidator:
-    @staticmethod
-    def sanitize_html(content):
-        if not content:
-            return ""
-        content = re.sub(r'^```html?\s*\n?', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'\n?```\s*$', '', content)
-        content = re.sub(r'```html?\s*\n?', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'\n?```', '', content)
-
-        dangerous_patterns = [
-            r'<script[^>]*>.*?</script>',
-            r'<iframe[^>]*>.*?</iframe>',
-            r'javascript:',
-            r'on\w+\s*=',
-            r'<object[^>]*>',
-            r'<embed[^>]*>',
-        ]
-        cleaned = content
-        for pattern in dangerous_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL)
-        return cleaned.strip()
-
-    @staticmethod
-    def validate_image_url(url):
-        if not url:
-            return False
-        try:
-            parsed = urlparse(url)
-            return parsed.scheme == 'https' and 'unsplash.com' in parsed.netloc
-        except Exception:
-            return False
+    """예전 호출부 호환용 네임스페이스 (본문은 위의 모듈 함수)"""
+    sanitize_html = staticmethod(sanitize_html)
+    validate_image_url = staticmethod(validate_image_url)
 
 # ==========================================
 # 🤖 MAIN BOT
@@ -393,21 +676,54 @@ class ProBlogBotV4:
         if not self.anthropic_key:
             raise ValueError("❌ ANTHROPIC_API_KEY required")
 
-        self.claude = Anthropic(api_key=self.anthropic_key)
-        self.validator = SecurityValidator()
+        self.claude = Anthropic(api_key=self.anthropic_key, max_retries=CLAUDE_MAX_RETRIES)
         self.conversation_history = []
 
-        self.persona = random.choice(SYSTEM_PROMPTS)
-        self.system_prompt = self.persona["prompt"] + UNIVERSAL_RULES
-        self.writing_format = random.choice(WRITING_FORMATS)
-        self.tone = random.choice(TONE_MODIFIERS)
-        self.quirks = random.sample(HUMAN_QUIRKS, 3)
+        # Unsplash 호출은 이미지마다 새 TCP+TLS 연결을 맺지 않도록 세션 하나로 재사용.
+        # 일시적인 429/5xx는 Retry-After를 존중하며 백오프 재시도 → 업스트림 Claude 단계를 다시 돌리지 않고 이미지만 살린다
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 502, 503, 504],
+            ),
+        ))
+        # 순수 네트워크 대기라 스레드로 겹치면 마커 N개가 RTT 1번 수준으로 끝난다
+        self._image_pool = ThreadPoolExecutor(max_workers=4)
+        self._image_futures = {}
+        # 섹션 병렬 작성 때 여러 스레드가 같은 응답 캐시 파일을 열므로 한 번에 하나씩
+        self._cache_lock = threading.Lock()
+        # 응답·구성안·완성본 shelve는 모두 이 디렉터리 아래에 파일을 만든다 (없으면 첫 open에서 실패)
+        if CLAUDE_CACHE_DIR:
+            os.makedirs(CLAUDE_CACHE_DIR, exist_ok=True)
+
+        self.rng = random.Random(hashlib.sha256(RUN_SEED.encode()).digest())
+        self.persona = self.rng.choice(SYSTEM_PROMPTS)
+        self.system_prompt = PERSONA_SYSTEM_PROMPTS[self.persona["name"]]
+        self.writing_format = self.rng.choice(WRITING_FORMATS)
+        self.tone = self.rng.choice(TONE_MODIFIERS)
+        self.quirks = self.rng.sample(HUMAN_QUIRKS, 3)
 
         self.existing_posts = []
+        self._blogger = None
+        self._blogger_creds = None
 
     def _get_blogger_service(self):
+        """Blogger API 클라이언트 (처음 한 번만 토큰 갱신 + build, 이후 재사용)
+
+        기존 글 조회와 발행이 같은 실행 안에서 둘 다 부르므로 매번 만들면
+        OAuth 토큰 교환과 discovery 문서 로딩을 두 번씩 하게 된다.
+        오래 도는 프로세스에서는 토큰이 만료됐을 때만 그 자리에서 갱신한다."""
         from google.auth.transport.requests import Request
 
+        if self._blogger is not None:
+            if self._blogger_creds.expired:
+                self._blogger_creds.refresh(Request())
+            return self._blogger
+
         user_info = {
             'client_id': os.getenv('OAUTH_CLIENT_ID'),
             'client_secret': os.getenv('OAUTH_CLIENT_SECRET'),
@@ -420,7 +736,15 @@ class ProBlogBotV4:
             scopes=['https://www.googleapis.com/auth/blogger'],
         )
         creds.refresh(Request())
-        return build('blogger', 'v3', credentials=creds)
+        self._blogger_creds = creds
+        # 패키지에 들어 있는 discovery 문서를 쓰고(HTTP 조회 없음), 쓸모없는 파일 캐시 시도도 끈다
+        self._blogger = build(
+            'blogger', 'v3',
+            credentials=creds,
+            static_discovery=True,
+            cache_discovery=False,
+        )
+        return self._blogger
 
     def fetch_existing_posts(self):
         print("📚 기존 게시물 불러오는 중...")
@@ -503,14 +827,16 @@ class ProBlogBotV4:
                 result.add(t[:2])
         return result
 
-    def is_duplicate(self, title):
-        if not self.existing_posts:
+    def is_duplicate(self, title, posts=None):
+        """posts(기본: 이미 발행된 글)와 제목이 같거나 키워드가 많이 겹치는지"""
+        posts = self.existing_posts if posts is None else posts
+        if not posts:
             return False
 
         title_norm = title.lower().strip()
         new_keywords = self._extract_keywords(title)
 
-        for post in self.existing_posts:
+        for post in posts:
             existing_norm = post['title'].lower().strip()
 
             if title_norm == existing_norm:
@@ -557,29 +883,125 @@ class ProBlogBotV4:
     # API call helpers (Opus 4.5용 - adaptive thinking 제거)
     # ------------------------------------------
 
-    def _call_claude(self, messages, max_tokens=4096):
+    def _call_claude(self, messages, max_tokens=4096, on_text=None, **extra):
         """Opus 4.5 API 호출 (adaptive thinking 없음)
 
         주의: Anthropic SDK의 messages.create()는 OpenAI식 response_format 인자를
-        지원하지 않는다. 구조화 출력은 프롬프트로 'JSON만 반환'을 지시하고
-        _parse_json()으로 파싱한다.
+        지원하지 않는다. 구성 단계는 tool_use(PLAN_TOOL)로 JSON을 받고, 그 밖의
+        구조화 출력은 프롬프트로 'JSON만 반환'을 지시해 _parse_json()으로 파싱한다.
+
+        시스템 프롬프트는 한 실행 내내 바이트 단위로 같으므로 캐시 블록으로 보낸다.
+        도구 정의가 앞에 붙는 구성 호출을 빼면 주제·초안·검토(같은 모델일 때) 호출이
+        이 접두부를 공유한다. 단, 접두부가 모델별 최소 캐시 길이(Opus 4.5는 4096토큰)보다
+        짧으면 캐시는 조용히 생략되므로 실제 적중 여부는 호출마다 찍는 캐시 토큰 수로 확인한다.
+
+        응답은 스트리밍으로 받는다. on_text를 주면 생성되는 텍스트 조각마다 호출되어
+        긴 초안이 다 나오기 전에 다음 작업(이미지 검색 등)을 시작할 수 있다.
+        반환값은 messages.create()와 같은 Message 객체다. extra는 model 등 호출 인자를 덮어쓴다.
         """
-        response = self.claude.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=max_tokens,
-            system=self.system_prompt,
-            messages=messages,
-        )
-        return response
+        return self._send(self._request_params(messages, max_tokens, **extra), on_text)
+
+    def _send(self, params, on_text=None):
+        cache_key = _response_cache_key(params) if CLAUDE_CACHE_DIR else None
+        if cache_key and not FORCE_REGEN:
+            with self._cache_lock, shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'responses')) as cache:
+                cached = cache.get(cache_key)
+            if cached is not None:
+                print("   ♻️ 캐시된 응답 재사용")
+                if on_text:
+                    on_text(self._extract_text(cached))
+                return cached
+
+        with self.claude.messages.stream(**params) as stream:
+            if on_text:
+                for text in stream.text_stream:
+                    on_text(text)
+            message = stream.get_final_message()
+
+        usage = message.usage
+        if usage.cache_read_input_tokens or usage.cache_creation_input_tokens:
+            print(f"   🧊 프롬프트 캐시: 읽기 {usage.cache_read_input_tokens or 0} / "
+                  f"쓰기 {usage.cache_creation_input_tokens or 0} 토큰")
+
+        # 잘린(max_tokens) 응답을 저장하면 같은 인자로 재실행할 때마다 같은 실패를 다시 읽으므로
+        # 정상 종료한 응답만 남긴다
+        if cache_key and message.stop_reason in ("end_turn", "tool_use"):
+            with self._cache_lock, shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'responses')) as cache:
+                cache[cache_key] = message
+        return message
+
+    def _request_params(self, messages, max_tokens, **extra):
+        """messages.create()와 배치 요청이 함께 쓰는 호출 인자 (extra: tools 등 추가 인자)"""
+        return {
+            'model': CLAUDE_MODEL,
+            'max_tokens': max_tokens,
+            # 캐시 브레이크포인트는 시스템 블록에만 둔다. 주제·초안·검토 호출이 같은 시스템 접두사를 읽고,
+            # 구성 호출은 도구 정의가 앞에 붙어 접두사가 다르다. 마지막 메시지에 붙이면 그 접두사를
+            # 이어 받는 다음 호출이 없어(검토는 초안을 새 단일 메시지로 보냄) 쓰기 요금만 25% 더 낸다.
+            'system': [_cached_text_block(self.system_prompt)],
+            'messages': list(messages),
+            **extra,
+        }
+
+    def _run_message_batch(self, params_by_id):
+        """{custom_id: 호출 인자}를 Message Batches API로 한 번에 제출하고 끝날 때까지 기다린다.
+
+        배치는 정가의 50%로 과금되고 처리량 제한도 넉넉하다. 대신 결과가 언제 올지
+        보장이 없으므로 스케줄 실행처럼 기다려도 되는 경우에만 쓴다.
+        성공한 항목만 {custom_id: Message}로 반환한다.
+
+        배치는 몇 분~몇 시간 걸려 기본 5분 캐시로는 단계 사이에 시스템 프롬프트가 만료된다.
+        모든 글·단계가 공유하는 시스템 블록을 1시간 TTL로 올려 세 번의 배치가 같은 캐시를 읽게 한다."""
+        if not params_by_id:
+            return {}
+
+        system = [_cached_text_block(self.system_prompt, ttl="1h")]
+        try:
+            batch = self.claude.messages.batches.create(requests=[
+                {"custom_id": custom_id, "params": {**params, "system": system}}
+                for custom_id, params in params_by_id.items()
+            ])
+        except Exception as e:
+            print(f"   ⚠️ 배치 제출 실패: {e}")
+            return {}
+        print(f"   📦 배치 제출: {batch.id} ({len(params_by_id)}건)")
+
+        deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+        results = {}
+        try:
+            while batch.processing_status != "ended":
+                if time.monotonic() >= deadline:
+                    print(f"   ⚠️ 배치가 {BATCH_MAX_WAIT_SECONDS}초 안에 끝나지 않음 — 취소: {batch.id}")
+                    self.claude.messages.batches.cancel(batch.id)
+                    return {}
+                time.sleep(BATCH_POLL_SECONDS)
+                batch = self.claude.messages.batches.retrieve(batch.id)
+
+            for entry in self.claude.messages.batches.results(batch.id):
+                if entry.result.type == "succeeded":
+                    results[entry.custom_id] = entry.result.message
+                else:
+                    print(f"   ⚠️ 배치 항목 실패: {entry.custom_id} ({entry.result.type})")
+        except Exception as e:
+            print(f"   ⚠️ 배치 조회 실패 ({batch.id}): {e}")
+        return results
 
     def _parse_json(self, text):
-        """모델 응답에서 JSON 추출 (```json 코드블록 감싸도 처리)"""
+        """모델 응답에서 JSON 추출 (```json 코드블록 감싸도 처리)
+
+        파싱이 깨지면 앞뒤 설명 문장과 끝 쉼표처럼 흔한 형태만 한 번 손봐서 다시 시도한다.
+        여기서 실패하면 호출부가 폴백(추가 API 호출)으로 가므로 한 번이라도 살리면 이득."""
+        match = _JSON_FENCE_RE.search(text)
+        if match:
+            text = match.group(1)
         text = text.strip()
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-        return json.loads(text.strip())
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            start, end = text.find('{'), text.rfind('}')
+            if start == -1 or end < start:
+                raise
+            return json.loads(_TRAILING_COMMA_RE.sub(r'\1', text[start:end + 1]))
 
     def _extract_text(self, response):
         """응답에서 텍스트 추출"""
@@ -590,11 +1012,11 @@ class ProBlogBotV4:
         return "\n".join(text_parts)
 
     def _append_to_history(self, role, content):
-        """Multi-turn 대화 히스토리 관리"""
+        """Multi-turn 대화 히스토리 관리 (assistant는 응답 객체 또는 텍스트)"""
         if role == "user":
             self.conversation_history.append({"role": "user", "content": content})
         elif role == "assistant":
-            text = self._extract_text(content)
+            text = content if isinstance(content, str) else self._extract_text(content)
             self.conversation_history.append({"role": "assistant", "content": text})
 
     # ------------------------------------------
@@ -646,7 +1068,7 @@ class ProBlogBotV4:
 
             valid_categories = list(categories.keys())
             if category not in valid_categories:
-                category = random.choice(valid_categories)
+                category = self.rng.choice(valid_categories)
 
             if self.is_duplicate(topic):
                 print(f"   ⚠️ 생성된 주제가 중복, 폴백으로 전환...")
@@ -662,21 +1084,15 @@ class ProBlogBotV4:
 
     def _topic_fallback(self):
         print("   ↳ 주제 풀에서 폴백...")
-        pool = FALLBACK_TOPICS.get(CURRENT_MODE, {})
-
-        all_topics = []
-        for cat, topics in pool.items():
-            for t in topics:
-                all_topics.append((cat, t))
-
-        random.shuffle(all_topics)
+        all_topics = list(FALLBACK_TOPIC_PAIRS.get(CURRENT_MODE, ()))
+        self.rng.shuffle(all_topics)
 
         for cat, topic in all_topics:
             if not self.is_duplicate(topic):
                 print(f"   ✅ 폴백: [{cat}] {topic}")
                 return cat, topic
 
-        cat, topic = random.choice(all_topics)
+        cat, topic = self.rng.choice(all_topics)
         print(f"   ⚠️ 폴백도 전부 중복, 그냥 사용: {topic}")
         return cat, topic
 
@@ -684,10 +1100,8 @@ class ProBlogBotV4:
     # Pipeline stages
     # ------------------------------------------
 
-    def step_1_plan(self, topic):
-        print(f"🧠 [1/7] 글 구성 짜는 중...")
-
-        prompt = f"""이 주제로 글을 써야 해요: "{topic}"
+    def _plan_prompt(self, topic):
+        return f"""이 주제로 글을 써야 해요: "{topic}"
 
 생각해볼 것:
 1. 이 주제에 대한 통념 중에 틀렸거나 불완전한 게 뭘까?
@@ -702,7 +1116,7 @@ class ProBlogBotV4:
 
 중요: image_queries는 반드시 영어로 작성하세요. Unsplash가 한글 검색어를 못 알아듣습니다.
 
-다음 키를 가진 JSON만 반환하세요(마크다운 코드블록 없이):
+구성은 emit_plan 도구로 제출하세요. 필드:
 - working_title (구체적 이득을 약속하는 SEO 친화적 한국어 제목)
 - hook_concept (도입을 어떻게 열지 한 문장)
 - contrarian_angle (어떤 통념을 뒤집는가)
@@ -710,27 +1124,104 @@ class ProBlogBotV4:
 - honest_caveat (한계 또는 '이런 경우엔 안 맞음' 하나)
 - image_queries (Unsplash 검색용 영어 문자열 2개)"""
 
-        try:
-            self._append_to_history("user", prompt)
+    def _plan_request(self, messages):
+        """구성 단계 호출 인자: emit_plan 도구 사용을 강제한다"""
+        return self._request_params(
+            messages,
+            2000,
+            tools=[PLAN_TOOL],
+            tool_choice={"type": "tool", "name": PLAN_TOOL["name"]},
+        )
 
-            response = self._call_claude(
-                messages=self.conversation_history,
-                max_tokens=2000,
-            )
+    def _plan_from_response(self, response):
+        """emit_plan 입력을 구성안으로. 잘렸거나 필수 키가 빠졌으면 ValueError (폴백·배치 제외로 넘긴다)
 
-            self._append_to_history("assistant", response)
-            text = self._extract_text(response)
-            plan = self._parse_json(text)
+        스키마는 문자열 길이를 묶지 않으므로 상한에 걸리면 반쯤 채운 입력이 그대로 올 수 있다."""
+        if response.stop_reason == "max_tokens":
+            raise ValueError("구성안이 토큰 상한에서 잘림")
+        for block in response.content:
+            if block.type == "tool_use" and block.name == PLAN_TOOL["name"]:
+                plan = dict(block.input)
+                missing = [key for key in PLAN_TOOL["input_schema"]["required"] if key not in plan]
+                if missing:
+                    raise ValueError(f"구성안에 필수 키 없음: {', '.join(missing)}")
+                return self._fill_plan_defaults(plan)
+        raise ValueError("emit_plan 도구 호출이 응답에 없음")
+
+    def _fill_plan_defaults(self, plan):
+        if len(plan.get("image_queries", [])) < 2:
+            plan["image_queries"] = ["office desk workspace", "person taking notes"]
+        return plan
+
+    def step_1_plan(self, topic):
+        print(f"🧠 [1/7] 글 구성 짜는 중...")
+
+        prompt = self._plan_prompt(topic)
+        cache_key = _plan_cache_key(topic, self.persona['name'])
+
+        cached = self._cached_plan(cache_key, topic)
+        if cached:
+            self._append_to_history("user", prompt)
+            self._append_to_history("assistant", _compact_json(cached))
+            return cached
+
+        try:
+            self._append_to_history("user", prompt)
 
-            if len(plan.get("image_queries", [])) < 2:
-                plan["image_queries"] = ["office desk workspace", "person taking notes"]
+            response = self._send(self._plan_request(self.conversation_history))
+            plan = self._plan_from_response(response)
+            self._remember_plan(cache_key, topic, plan)
 
+            # tool_use 블록은 tool_result 없이 다음 턴을 이을 수 없으니 구성안을 텍스트 턴으로 남긴다
+            self._append_to_history("assistant", _compact_json(plan))
             return plan
 
         except Exception as e:
             print(f"⚠️ 구성 짜기 실패: {e}")
             return self._plan_fallback(topic)
 
+    def _cached_plan(self, cache_key, topic):
+        """같은 주제(정규화 일치)의 구성안, 없으면 같은 페르소나의 키워드가 충분히 겹치는 주제의 구성안
+
+        구성안 제목이 이미 발행된 글과 겹치면(그 구성으로 글을 이미 냈으면) 재사용하지 않는다.
+        그대로 쓰면 옛 구성을 '(다시 보기)' 제목으로 다시 발행하게 된다."""
+        if not (PLAN_CACHE_ENABLED and CLAUDE_CACHE_DIR):
+            return None
+
+        keywords = self._extract_keywords(topic)
+        best, best_similarity = None, PLAN_REUSE_SIMILARITY
+        with shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'plans')) as cache:
+            entry = cache.get(cache_key)
+            if entry and not self.is_duplicate(entry['plan']['working_title']):
+                print("   ♻️ 같은 주제로 짰던 구성 재사용")
+                return entry['plan']
+
+            for entry in cache.values():
+                if entry['persona'] != self.persona['name'] or not keywords or not entry['keywords']:
+                    continue
+                if self.is_duplicate(entry['plan']['working_title']):
+                    continue
+                overlap = len(keywords & entry['keywords'])
+                similarity = overlap / max(len(keywords), len(entry['keywords']))
+                if similarity >= best_similarity:
+                    best, best_similarity = entry, similarity
+
+        if best:
+            print(f"   ♻️ 비슷한 주제의 구성 재사용: '{best['topic']}' ({best_similarity:.0%})")
+            return best['plan']
+        return None
+
+    def _remember_plan(self, cache_key, topic, plan):
+        if not (PLAN_CACHE_ENABLED and CLAUDE_CACHE_DIR):
+            return
+        with shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'plans')) as cache:
+            cache[cache_key] = {
+                'topic': topic,
+                'persona': self.persona['name'],
+                'keywords': self._extract_keywords(topic),
+                'plan': plan,
+            }
+
     def _plan_fallback(self, topic):
         print("   ↳ 폴백 구성 시도...")
         self.conversation_history = []
@@ -757,30 +1248,19 @@ JSON만, 마크다운 코드블록 없이:"""
 
             self._append_to_history("assistant", response)
             text = self._extract_text(response)
-
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0]
-
-            return json.loads(text.strip())
+            return self._fill_plan_defaults(self._parse_json(text))
 
         except Exception as e:
             print(f"⚠️ 폴백 구성도 실패: {e}")
             return None
 
-    def step_2_write_draft(self, plan):
-        print(f"✍️ [2/7] 초안 작성 중...")
-        print(f"   📐 형식: {self.writing_format['name']}")
-        print(f"   🎭 톤: {self.tone['name']}")
-        print(f"   👤 페르소나: {self.persona['name']}")
-
+    def _draft_prompt(self, plan):
         quirks_str = "\n".join(f"- {q}" for q in self.quirks)
 
-        prompt = f"""우리가 짠 구성을 바탕으로:
+        return f"""우리가 짠 구성을 바탕으로:
 - 제목: {plan['working_title']}
 - 각도: {plan['contrarian_angle']}
-- 섹션: {json.dumps(plan['sections'], indent=2, ensure_ascii=False)}
+- 섹션: {_compact_json(plan['sections'])}
 - 한계: {plan['honest_caveat']}
 
 전체 블로그 글을 HTML 형식으로 작성하세요. 한국어로 씁니다.
@@ -813,32 +1293,103 @@ JSON만, 마크다운 코드블록 없이:"""
 - 뻔한 빈 문단 금지
 - 모든 섹션이 구체적 가치를 더해야 함"""
 
+    def step_2_write_draft(self, plan):
+        print(f"✍️ [2/7] 초안 작성 중...")
+        print(f"   📐 형식: {self.writing_format['name']}")
+        print(f"   🎭 톤: {self.tone['name']}")
+        print(f"   👤 페르소나: {self.persona['name']}")
+
+        prompt = self._draft_prompt(plan)
+
+        if PARALLEL_SECTIONS and len(plan['sections']) >= 2:
+            draft = self._write_sections_parallel(plan, prompt)
+            if draft:
+                self._append_to_history("user", prompt)
+                self._append_to_history("assistant", draft)
+                return draft
+
         self._append_to_history("user", prompt)
 
+        streamed = []
+
+        def prefetch_streamed_images(text):
+            # [IMAGE: ...] 마커가 닫히는 즉시 검색을 시작해 나머지 생성 시간 뒤에 숨긴다
+            streamed.append(text)
+            if ']' in text:
+                self._prefetch_images(''.join(streamed))
+
         try:
             response = self._call_claude(
                 messages=self.conversation_history,
-                max_tokens=8000,
+                max_tokens=ARTICLE_MAX_TOKENS,
+                on_text=prefetch_streamed_images if self.unsplash_key else None,
             )
 
+            if response.stop_reason == "max_tokens":
+                print(f"   ⚠️ 초안이 {ARTICLE_MAX_TOKENS} 토큰에서 잘림 — 검토 단계에서 마무리")
             self._append_to_history("assistant", response)
             draft = self._extract_text(response)
-            return self.validator.sanitize_html(draft)
+            return sanitize_html(draft)
 
         except Exception as e:
             print(f"⚠️ 작성 실패: {e}")
             return None
 
-    def step_3_revise(self, draft):
-        """검토(critique) + 사람화(humanize)를 한 번의 호출로 통합.
+    def _section_scope(self, plan, index):
+        """섹션 하나만 쓰게 하는 범위 지시 (전체 초안 프롬프트 뒤에 붙인다)"""
+        sections = plan['sections']
+        count = len(sections)
+        # 이미지 마커 2개는 첫 섹션과 가운데 섹션이 하나씩 맡는다
+        markers = {0: plan['image_queries'][0], count // 2: plan['image_queries'][1]}
+        marker = f"이미지 마커는 [IMAGE: {markers[index]}] 정확히 1개" if index in markers else "이미지 마커는 넣지 말 것"
+
+        if index == 0:
+            position = "첫 섹션이므로 <h2> 앞에 말 걸듯 여는 도입 문단을 먼저 쓸 것"
+        elif index == count - 1:
+            position = f"마지막 섹션이므로 한계({plan['honest_caveat']})를 짚으며 자연스럽게 끝맺을 것"
+        else:
+            position = "가운데 섹션이므로 도입·맺음말 없이 본론만"
+
+        return f"""
+
+## 이번 호출의 범위 (위 요구사항보다 우선)
+전체 {count}개 섹션 중 {index + 1}번째 섹션만 작성하세요: {_compact_json(sections[index])}
+- 이 섹션의 <h2>부터 쓰고, 다른 섹션 내용은 쓰지 말 것 (나머지는 동시에 따로 작성됨)
+- 분량은 전체 분량의 1/{count} 정도
+- {position}
+- {marker}"""
+
+    def _write_sections_parallel(self, plan, prompt):
+        """섹션마다 초안 호출을 따로 보내 동시에 받고 순서대로 이어 붙인다 (하나라도 실패하면 None).
+
+        호출마다 같은 전체 초안 지시에 범위만 덧붙이므로 형식·톤·문체 규칙은 한 번에 쓸 때와 같다.
+        구성안 이미지 쿼리는 run()에서 이미 미리 받고 있으므로 스트리밍 중 마커 검색은 하지 않는다."""
+        sections = plan['sections']
+        print(f"   ⚡ 섹션 {len(sections)}개 동시 작성")
+
+        def write_section(index):
+            response = self._call_claude(
+                messages=[
+                    *self.conversation_history,
+                    {"role": "user", "content": prompt + self._section_scope(plan, index)},
+                ],
+                max_tokens=SECTION_MAX_TOKENS,
+            )
+            if response.stop_reason == "max_tokens":
+                raise RuntimeError(f"{index + 1}번째 섹션이 {SECTION_MAX_TOKENS} 토큰에서 잘림")
+            return sanitize_html(self._extract_text(response))
 
-        기존엔 초안 → 검토 재작성 → 사람화 재작성으로 '전체 글 생성'을 3번 했다.
-        검토와 사람화는 목표(AI 티 제거·어미/문장 다양화)가 크게 겹치므로,
-        둘을 한 패스로 합쳐 전체 생성 1회를 줄인다(비용 약 1/3 절감, 품질 동등).
-        멀티턴 히스토리 대신 초안을 직접 임베드해 입력 토큰도 아낀다."""
-        print(f"🔧 [3/6] 검토·사람화 통합 개선...")
+        try:
+            with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+                parts = list(pool.map(write_section, range(len(sections))))
+        except Exception as e:
+            print(f"   ⚠️ 섹션 병렬 작성 실패, 한 번에 작성으로 전환: {e}")
+            return None
 
-        revise_prompt = f"""아래 초안을 검토하고 고쳐서, 진짜 사람이 쓴 블로그 글로 다시 써주세요.
+        return "\n\n".join(parts)
+
+    def _revise_prompt(self, draft):
+        return f"""아래 초안을 검토하고 고쳐서, 진짜 사람이 쓴 블로그 글로 다시 써주세요.
 한 번에 (1) 문제 교정과 (2) 사람 같은 문체를 모두 적용합니다.
 
 ## (1) 검토 체크리스트 — 가차없이 고칠 것
@@ -869,60 +1420,96 @@ JSON만, 마크다운 코드블록 없이:"""
 ## 출력
 개선된 HTML 글만. 설명·인사말 금지. 마크다운 코드블록 금지."""
 
+    def _accept_revision(self, draft, response):
+        if response.stop_reason == "max_tokens":
+            print("   ⚠️ 개선본이 중간에 잘림, 초안 사용")
+            return draft
+
+        result = sanitize_html(self._extract_text(response))
+
+        if len(result) < 500:
+            print("   ⚠️ 개선본이 너무 짧음, 초안 사용")
+            return draft
+
+        return result
+
+    def step_3_revise(self, draft):
+        """검토(critique) + 사람화(humanize)를 한 번의 호출로 통합.
+
+        기존엔 초안 → 검토 재작성 → 사람화 재작성으로 '전체 글 생성'을 3번 했다.
+        검토와 사람화는 목표(AI 티 제거·어미/문장 다양화)가 크게 겹치므로,
+        둘을 한 패스로 합쳐 전체 생성 1회를 줄인다(비용 약 1/3 절감, 품질 동등).
+        멀티턴 히스토리 대신 초안을 직접 임베드해 입력 토큰도 아낀다."""
+        print(f"🔧 [3/6] 검토·사람화 통합 개선...")
+
+        revise_prompt = self._revise_prompt(draft)
+
         try:
             response = self._call_claude(
                 messages=[{"role": "user", "content": revise_prompt}],
-                max_tokens=8000,
+                max_tokens=ARTICLE_MAX_TOKENS,
+                model=CLAUDE_REVISE_MODEL,
             )
 
-            improved = self._extract_text(response)
-            result = self.validator.sanitize_html(improved)
-
-            if len(result) < 500:
-                print("   ⚠️ 개선본이 너무 짧음, 초안 사용")
-                return draft
-
-            return result
+            return self._accept_revision(draft, response)
 
         except Exception as e:
             print(f"⚠️ 검토·사람화 실패: {e}")
             return draft
 
-    def step_5_add_images(self, content):
-        print(f"🎨 [5/7] 이미지 추가...")
+    def _prefetch_images(self, content):
+        """content 속 마커마다 이미지 검색을 백그라운드로 시작하고 마커 순서대로 Future 반환.
+
+        (쿼리, 몇 번째 등장) 단위로 한 번만 시작하므로 스트리밍 중 여러 번 불러도 되고,
+        같은 쿼리가 두 번 나오면 사진도 따로 받는다."""
+        futures = []
+        seen = {}
+        for match in _IMAGE_MARKER_RE.finditer(content):
+            query = match.group(1).strip()
+            key = (query, seen.get(query, 0))
+            seen[query] = key[1] + 1
+            if key not in self._image_futures:
+                self._image_futures[key] = self._image_pool.submit(self._fetch_image, query)
+            futures.append(self._image_futures[key])
+        return futures
+
+    def _prefetch_plan_images(self, plan):
+        """구성안의 image_queries로 바로 검색을 시작 (초안이 같은 쿼리로 마커를 달면 그대로 재사용)"""
+        if self.unsplash_key:
+            self._prefetch_images(''.join(f"[IMAGE: {q}]" for q in plan['image_queries']))
+
+    def _fetch_image(self, query):
+        """Unsplash에서 사진 하나를 받아 <figure> HTML로 반환 (실패하면 빈 문자열)"""
+        print(f"   🔍 검색: {query}")
 
-        if not self.unsplash_key:
-            print("   ⚠️ Unsplash 키 없음 — 이미지 건너뜀")
-            return re.sub(r'\[IMAGE:.*?\]', '', content)
-
-        markers = re.findall(r'\[IMAGE:.*?\]', content)
+        try:
+            response = self._http.get(
+                "https://api.unsplash.com/photos/random",
+                params={
+                    'query': query,
+                    'client_id': self.unsplash_key,
+                    'orientation': 'landscape',
+                },
+                timeout=10,
+            )
 
-        for marker in markers:
-            query = marker.replace('[IMAGE:', '').replace(']', '').strip()
-            print(f"   🔍 검색: {query}")
+            if response.status_code != 200:
+                print(f"   ⚠️ Unsplash API 응답 코드 {response.status_code}")
+                return ''
 
-            try:
-                response = requests.get(
-                    "https://api.unsplash.com/photos/random",
-                    params={
-                        'query': query,
-                        'client_id': self.unsplash_key,
-                        'orientation': 'landscape',
-                    },
-                    timeout=10,
-                )
+            data = response.json()
+            if isinstance(data, list):
+                data = data[0]
 
-                if response.status_code == 200:
-                    data = response.json()
-                    if isinstance(data, list):
-                        data = data[0]
+            img_url = data['urls']['regular']
+            if not validate_image_url(img_url):
+                print(f"   ⚠️ Unsplash가 아닌 이미지 URL 무시: {img_url}")
+                return ''
+            user_name = data['user']['name']
+            user_link = f"https://unsplash.com/@{data['user']['username']}?utm_source=insightcrossroad&utm_medium=referral"
+            unsplash_link = "https://unsplash.com/?utm_source=insightcrossroad&utm_medium=referral"
 
-                    img_url = data['urls']['regular']
-                    user_name = data['user']['name']
-                    user_link = f"https://unsplash.com/@{data['user']['username']}?utm_source=insightcrossroad&utm_medium=referral"
-                    unsplash_link = "https://unsplash.com/?utm_source=insightcrossroad&utm_medium=referral"
-
-                    img_html = f'''
+            return f'''
 <figure style="margin: 2.5rem 0; text-align: center;">
     <img src="{img_url}" alt="{query}"
          style="width: 100%; max-width: 800px; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.08);"
@@ -933,16 +1520,26 @@ JSON만, 마크다운 코드블록 없이:"""
     </figcaption>
 </figure>
 '''
-                    content = content.replace(marker, img_html, 1)
-                else:
-                    print(f"   ⚠️ Unsplash API 응답 코드 {response.status_code}")
-                    content = content.replace(marker, '', 1)
 
-            except Exception as e:
-                print(f"   ⚠️ 이미지 가져오기 실패: {e}")
-                content = content.replace(marker, '', 1)
+        except Exception as e:
+            print(f"   ⚠️ 이미지 가져오기 실패: {e}")
+            return ''
 
-        return content
+    def step_5_add_images(self, content):
+        print(f"🎨 [5/7] 이미지 추가...")
+
+        if not self.unsplash_key:
+            print("   ⚠️ Unsplash 키 없음 — 이미지 건너뜀")
+            return _IMAGE_MARKER_RE.sub('', content)
+
+        # 초안 스트리밍 중 이미 시작된 검색은 결과만 받고, 나머지는 여기서 한꺼번에 시작
+        futures = self._prefetch_images(content)
+        if not futures:
+            return content
+
+        # Future는 마커 등장 순서라 sub 한 번으로 본문을 한 번만 훑으며 차례로 끼운다
+        pending = iter(futures)
+        return _IMAGE_MARKER_RE.sub(lambda m: next(pending).result(), content)
 
     def step_6_add_internal_links(self, content, title, labels):
         print(f"🔗 [6/7] 내부 링크 추가...")
@@ -966,90 +1563,15 @@ JSON만, 마크다운 코드블록 없이:"""
         print(f"   ✅ 내부 링크 {len(related)}개 추가")
         return content + links_html
 
-    def step_7_publish(self, title, content, category):
+    def step_7_publish(self, title, content, tags):
         print(f"🚀 [7/7] Blogger에 발행...")
 
-        css = '''
-<style>
-    .post-body {
-        font-family: 'Apple SD Gothic Neo', 'Malgun Gothic', 'Noto Sans KR', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-        line-height: 1.85;
-        color: #1f2937;
-        font-size: 1.0625rem;
-        word-break: keep-all;
-    }
-    .post-body h2 {
-        font-size: 1.625rem;
-        font-weight: 700;
-        color: #111827;
-        margin: 3rem 0 1.25rem;
-        letter-spacing: -0.02em;
-    }
-    .post-body h3 {
-        font-size: 1.3rem;
-        font-weight: 600;
-        color: #374151;
-        margin: 2rem 0 1rem;
-    }
-    .post-body p {
-        margin-bottom: 1.5rem;
-    }
-    .post-body ul, .post-body ol {
-        margin: 1.5rem 0;
-        padding-left: 1.5rem;
-    }
-    .post-body li {
-        margin-bottom: 0.75rem;
-    }
-    .post-body blockquote {
-        border-left: 4px solid #3b82f6;
-        padding: 1rem 1.5rem;
-        background: #f8fafc;
-        color: #475569;
-        margin: 2rem 0;
-        border-radius: 0 8px 8px 0;
-    }
-    .post-body table {
-        width: 100%; border-collapse: collapse; margin: 2rem 0; font-size: 0.95rem;
-    }
-    .post-body th {
-        background: #f1f5f9; font-weight: 600; text-align: left;
-        padding: 1rem; border-bottom: 2px solid #e2e8f0;
-    }
-    .post-body td {
-        padding: 1rem; border-bottom: 1px solid #f1f5f9;
-    }
-    .disclaimer {
-        background: #fef2f2; padding: 1.25rem; border-radius: 8px;
-        font-size: 0.875rem; color: #991b1b; margin-top: 2rem;
-        border: 1px solid #fecaca;
-    }
-</style>
-'''
-
-        disclaimer = ''
-        if CURRENT_MODE == 'MONEY':
-            disclaimer = '''
-<div class="disclaimer">
-    <strong>안내:</strong> 이 글의 일부 링크는 제휴 링크일 수 있으며,
-    독자에게 추가 비용 없이 이 사이트 운영에 도움이 됩니다.
-    직접 조사해서 괜찮았던 것만 소개합니다.
-</div>
-'''
-
-        final_html = f"{css}<div class='post-body'>{content}{disclaimer}</div>"
-
-        tags = [category]
-        tag_map = {
-            'APPROVAL': ['생활정보', '꿀팁', '정리'],
-            'MONEY': ['리뷰', '비교', '추천'],
-        }
-        tags.extend(random.sample(tag_map.get(CURRENT_MODE, []), 2))
+        final_html = f"{POST_HTML_HEAD}{content}{POST_HTML_TAIL}"
 
         body = {
             'title': title,
             'content': final_html,
-            'labels': list(set(tags)),
+            'labels': tags,
         }
 
         try:
@@ -1070,7 +1592,51 @@ JSON만, 마크다운 코드블록 없이:"""
             print(f"❌ 발행 실패: {e}")
             return None
 
-    def run(self):
+    def _load_finished_post(self, cache_key):
+        """발행 전에 저장해 둔 (title, content, category) — 없거나 만료됐으면 None"""
+        if not CLAUDE_CACHE_DIR or FORCE_REGEN:
+            return None
+        with shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'posts')) as cache:
+            entry = cache.get(cache_key)
+        if not entry or time.time() - entry['saved_at'] > POST_CACHE_TTL:
+            return None
+        return entry['title'], entry['content'], entry['category']
+
+    def _save_finished_post(self, cache_key, title, content, category):
+        if not CLAUDE_CACHE_DIR or not cache_key:
+            return
+        with shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'posts')) as cache:
+            cache[cache_key] = {
+                'title': title, 'content': content, 'category': category,
+                'saved_at': time.time(),
+            }
+
+    def _drop_finished_post(self, cache_key):
+        if not CLAUDE_CACHE_DIR or not cache_key:
+            return
+        with shelve.open(os.path.join(CLAUDE_CACHE_DIR, 'posts')) as cache:
+            cache.pop(cache_key, None)
+
+    def _finish_post(self, category, title, content, cache_key=None):
+        """이미지 → 내부 링크 → 발행 (실시간·배치 공통 마무리)"""
+        with_images = self.step_5_add_images(content)
+        # 미리 받은 사진은 이 글 몫. 배치에서 다음 글이 같은 쿼리를 써도 새로 받게 비운다
+        self._image_futures.clear()
+        self._save_finished_post(cache_key, title, with_images, category)
+        return self._publish_with_links(category, title, with_images, cache_key)
+
+    def _publish_with_links(self, category, title, content, cache_key=None):
+        """태그 → 내부 링크 → 발행. 발행에 성공하면 저장해 둔 완성본은 지운다"""
+        # 내부 링크 고를 때 쓴 태그를 그대로 발행 라벨로 넘긴다 (다시 뽑으면 둘이 어긋난다)
+        tags = [category, *self.rng.sample(TAG_MAP.get(CURRENT_MODE, ()), 2)]
+
+        final_content = self.step_6_add_internal_links(content, title, tags)
+        result = self.step_7_publish(title, final_content, tags)
+        if result:
+            self._drop_finished_post(cache_key)
+        return result
+
+    def _print_banner(self):
         print(f"""
 ╔═══════════════════════════════════════════════════════════════════╗
 ║  Pro Blog Bot v5.0 - Korean Edition (Opus 4.5)                   ║
@@ -1081,6 +1647,19 @@ JSON만, 마크다운 코드블록 없이:"""
 ╚═══════════════════════════════════════════════════════════════════╝
 """)
 
+    def _resolve_title(self, plan):
+        title = plan['working_title']
+
+        if self.is_duplicate(title):
+            print(f"⚠️ 기획된 제목이 중복: {title}")
+            print("   제목 조정...")
+            title = f"{title} (다시 보기)"
+
+        return title
+
+    def run(self):
+        self._print_banner()
+
         self.fetch_existing_posts()
         category, topic = self.step_0_generate_topic()
 
@@ -1088,6 +1667,15 @@ JSON만, 마크다운 코드블록 없이:"""
         print(f"📝 주제: {topic}")
         print("-" * 60)
 
+        cache_key = _post_cache_key(topic, self.system_prompt)
+        cached = self._load_finished_post(cache_key)
+        if cached:
+            print("♻️ 지난 실행에서 발행하지 못한 완성본 재사용 (FORCE_REGEN=1이면 새로 생성)")
+            title, content, category = cached
+            self._publish_with_links(category, title, content, cache_key)
+            print("\n✅ 파이프라인 완료!")
+            return
+
         self.conversation_history = []
 
         plan = self.step_1_plan(topic)
@@ -1095,12 +1683,10 @@ JSON만, 마크다운 코드블록 없이:"""
             print("❌ 구성 짜기 실패 — 중단")
             return
 
-        title = plan['working_title']
+        # 이미지 쿼리는 구성 단계에서 이미 정해지므로 초안·검토 생성 시간 동안 미리 받아 둔다
+        self._prefetch_plan_images(plan)
 
-        if self.is_duplicate(title):
-            print(f"⚠️ 기획된 제목이 중복: {title}")
-            print("   제목 조정...")
-            title = f"{title} (다시 보기)"
+        title = self._resolve_title(plan)
 
         print(f"   📌 제목: {title}")
         print(f"   💡 각도: {plan['contrarian_angle']}")
@@ -1114,21 +1700,101 @@ JSON만, 마크다운 코드블록 없이:"""
         if not improved:
             improved = draft
 
-        with_images = self.step_5_add_images(improved)
+        self._finish_post(category, title, improved, cache_key)
 
-        tags = [category]
-        tag_map = {
-            'APPROVAL': ['생활정보', '꿀팁', '정리'],
-            'MONEY': ['리뷰', '비교', '추천'],
-        }
-        tags.extend(random.sample(tag_map.get(CURRENT_MODE, []), 2))
+        print("\n✅ 파이프라인 완료!")
 
-        final_content = self.step_6_add_internal_links(with_images, title, tags)
-        self.step_7_publish(title, final_content, category)
+    def run_batch(self, count):
+        """글 count개를 구성 → 초안 → 검토 단계별로 묶어 Message Batches API로 처리.
 
-        print("\n✅ 파이프라인 완료!")
+        단계마다 앞 단계 결과가 있어야 다음 프롬프트를 만들 수 있으므로 배치는 3번 제출된다.
+        주제 생성은 서로 겹치지 않게 하나씩 실시간으로 고르고, 이미지·링크·발행도
+        기존 실시간 경로를 그대로 쓴다. 페르소나·형식·톤은 한 실행 안에서 공유된다."""
+        self._print_banner()
+        self.fetch_existing_posts()
+
+        posts = {}
+        published_count = len(self.existing_posts)
+        for i in range(count):
+            category, topic = self.step_0_generate_topic()
+            posts[f"post-{i}"] = {'category': category, 'topic': topic}
+            # 같은 배치 안의 다음 주제가 방금 고른 주제와 겹치지 않도록 잠시 기존 글처럼 취급
+            self.existing_posts.append({
+                'id': None, 'title': topic, 'url': '', 'labels': [category], 'published': '',
+            })
+        # 그대로 두면 각 글의 기획 제목이 자기 주제와 중복으로 잡힌다
+        del self.existing_posts[published_count:]
+
+        print(f"🧠 [1/7] 구성 배치 ({len(posts)}건)...")
+        results = self._run_message_batch({
+            custom_id: self._plan_request(
+                [{"role": "user", "content": self._plan_prompt(post['topic'])}],
+            )
+            for custom_id, post in posts.items()
+        })
+        for custom_id, response in results.items():
+            post = posts[custom_id]
+            try:
+                post['plan'] = self._plan_from_response(response)
+            except Exception as e:
+                print(f"   ⚠️ 구성 파싱 실패 ({post['topic']}): {e}")
+        posts = {k: v for k, v in posts.items() if 'plan' in v}
+        if not posts:
+            print("❌ 구성 배치에서 살아남은 글 없음 — 중단")
+            return
+
+        print(f"✍️ [2/7] 초안 배치 ({len(posts)}건)...")
+        results = self._run_message_batch({
+            custom_id: self._request_params([
+                {"role": "user", "content": self._plan_prompt(post['topic'])},
+                {"role": "assistant", "content": _compact_json(post['plan'])},
+                {"role": "user", "content": self._draft_prompt(post['plan'])},
+            ], ARTICLE_MAX_TOKENS)
+            for custom_id, post in posts.items()
+        })
+        for custom_id, response in results.items():
+            if response.stop_reason == "max_tokens":
+                print(f"   ⚠️ 초안이 {ARTICLE_MAX_TOKENS} 토큰에서 잘림 ({posts[custom_id]['topic']}) — 검토 단계에서 마무리")
+            draft = sanitize_html(self._extract_text(response))
+            if draft:
+                posts[custom_id]['draft'] = draft
+        posts = {k: v for k, v in posts.items() if 'draft' in v}
+        if not posts:
+            print("❌ 초안 배치에서 살아남은 글 없음 — 중단")
+            return
+
+        print(f"🔧 [3/6] 검토·사람화 배치 ({len(posts)}건)...")
+        results = self._run_message_batch({
+            custom_id: self._request_params(
+                [{"role": "user", "content": self._revise_prompt(post['draft'])}],
+                ARTICLE_MAX_TOKENS,
+                model=CLAUDE_REVISE_MODEL,
+            )
+            for custom_id, post in posts.items()
+        })
+
+        # 배치 안의 글끼리는 아직 발행 전이라 is_duplicate의 기존 글 목록에 없으므로 따로 대조한다
+        finished = []
+        for custom_id, post in posts.items():
+            title = self._resolve_title(post['plan'])
+            if self.is_duplicate(title, finished):
+                print(f"   ⚠️ 같은 배치의 다른 글과 제목이 겹침 — 건너뜀: {title}")
+                continue
+
+            content = post['draft']
+            if custom_id in results:
+                content = self._accept_revision(content, results[custom_id])
+
+            print(f"\n📝 {title}")
+            self._finish_post(post['category'], title, content)
+            finished.append({'title': title})
+
+        print(f"\n✅ 배치 파이프라인 완료! ({len(finished)}/{count}건)")
 
 
 if __name__ == "__main__":
     bot = ProBlogBotV4()
-    bot.run()
+    if BATCH_POSTS > 1:
+        bot.run_batch(BATCH_POSTS)
+    else:
+        bot.run()
@@ -0,0 +1,72 @@
+"""sanitize_html 회귀 테스트 (pip install -r requirements.txt 후 저장소 루트에서 python -m pytest)"""
+import random
+import re
+from html.parser import HTMLParser
+
+from profit_blog import sanitize_html
+
+
+def test_handler_after_quoted_gt_is_removed():
+    # 따옴표 값 안의 '>'에서 태그가 끝난 것으로 보면 뒤의 핸들러를 놓친다
+    assert sanitize_html('<div title=">" onclick="evil()">x</div>') == '<div title=">">x</div>'
+    assert sanitize_html('<img alt="a>b" onerror="alert(1)">') == '<img alt="a>b">'
+
+
+def test_handler_removed_with_value():
+    assert sanitize_html('<img src="x" onerror="alert(1)">') == '<img src="x">'
+    assert sanitize_html('<img src=x onerror=alert(1)//>') == '<img src=x>'
+    assert sanitize_html('<img src="x"onerror=y>') == '<img src="x">'
+
+
+def test_quote_inside_unquoted_value_does_not_shift_tag_end():
+    # '=' 바로 뒤가 아닌 따옴표는 값을 감싸지 않는다 (브라우저는 d=" > " 를 값으로, onerror를 속성으로 본다)
+    assert sanitize_html('<img a=b"c d=" > " onerror=x>') == '<img a=b"c d=" > ">'
+
+
+def test_comment_and_raw_text_openers_are_dropped():
+    assert 'onerror' not in sanitize_html('<!-- <a title=" --> <img a=" > " onerror=x>')
+    # <style>을 지우고 나면 브라우저도 뒤쪽 " onerror=x> 를 태그 밖 글자로 읽는다
+    html = '<style><a title="</style><img a=" > " onerror=x>'
+    assert sanitize_html(html) == '<a title="</style><img a=" > " onerror=x>'
+
+
+def test_text_outside_tags_is_untouched():
+    html = '<p>Going online= now, a < b onload=1</p><b onclick=x>hi</b>'
+    assert sanitize_html(html) == '<p>Going online= now, a < b onload=1</p><b>hi</b>'
+
+
+def test_code_fence_and_script_removed():
+    assert sanitize_html('```html\n<p>x</p><script>alert(1)</script>\n```') == '<p>x</p>'
+
+
+class _HandlerFinder(HTMLParser):
+    """표준 라이브러리 파서가 읽은 시작 태그에 값 있는 on* 속성이 남았는지 본다"""
+
+    def __init__(self):
+        super().__init__()
+        self.found = False
+
+    def handle_starttag(self, tag, attrs):
+        if any(re.fullmatch(r'on\w+', name) and value for name, value in attrs):
+            self.found = True
+
+
+def _has_live_handler(html):
+    finder = _HandlerFinder()
+    finder.feed(html)
+    finder.close()
+    return finder.found or 'javascript:' in html.lower()
+
+
+def test_random_fragments_leave_no_handler_for_html_parser():
+    # 태그 경계를 흔드는 조각들을 섞어 sanitize 결과를 html.parser로 다시 읽어 본다 (시드 고정)
+    fragments = [
+        '<div', '<img', '>', ' ', '/', '"', "'", 'on', 'click', 'error', '=', 'x',
+        'javascript:', '<script>', '</script>', 'title=', '\n', 'ON', 'a>b', '<',
+        '<!--', '-->', '<style>', '<!x>', '<?', '</', 'a=b"',
+    ]
+    rng = random.Random(5)
+    for _ in range(20000):
+        html = ''.join(rng.choice(fragments) for _ in range(rng.randint(0, 16)))
+        cleaned = sanitize_html(html)
+        assert not _has_live_handler(cleaned), (html, cleaned)